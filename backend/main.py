@@ -1,6 +1,6 @@
 import base64
 import binascii
-import json
+import functools
 import os
 import re
 import shutil
@@ -9,19 +9,25 @@ import threading
 import time
 import uuid
 import zipfile
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Optional
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
 from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from lxml import etree
+from lxml import html as lxml_html
 from mutagen.id3 import APIC, COMM, ID3, TALB, TIT2, TLEN, TPE1, TPOS, TRCK, TDRC, TXXX
 from mutagen.mp4 import MP4, MP4Cover
 from mutagen.mp3 import MP3
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
 from yt_dlp import YoutubeDL
 from yt_dlp.utils import DownloadError
 
@@ -38,12 +44,70 @@ app.add_middleware(
 )
 
 SPOTIFY_TOKEN_CACHE: dict[str, float | str | None] = {"access_token": None, "expires_at": 0.0}
+SPOTIFY_TOKEN_LOCK = threading.Lock()
+# Refresh a little before expiry so in-flight playlist pagination never carries a stale token.
+SPOTIFY_TOKEN_MARGIN = 60
 PLAYLIST_JOBS: dict[str, dict] = {}
 PLAYLIST_JOBS_LOCK = threading.Lock()
 OUTPUT_FORMATS = {"best", "mp3", "m4a", "opus"}
 DEFAULT_OUTPUT_FORMAT = "mp3"
-YTDLP_COOKIEFILE_CACHE: dict[str, Optional[str]] = {"path": None}
+MAX_COVER_BYTES = 2 * 1024 * 1024
+COVER_CACHE: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+COVER_CACHE_LOCK = threading.Lock()
+COVER_CACHE_SIZE = 128
+OEMBED_CACHE: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+OEMBED_CACHE_LOCK = threading.Lock()
+OEMBED_CACHE_SIZE = 4096
+OEMBED_CACHE_TTL = 24 * 3600
+SPOTIFY_PAGE_WORKERS = 8
+YTDLP_COOKIEFILE_CACHE: dict[str, float | str | None] = {"path": None, "resolved": None, "checked_at": 0.0}
+YTDLP_COOKIEFILE_TTL = 60.0
 YTDLP_COOKIEFILE_LOCK = threading.Lock()
+YDL_CACHE = threading.local()
+
+# Shared keep-alive pool so repeated Spotify/YouTube lookups skip the TCP+TLS handshake.
+HTTP_POOL_SIZE = 64
+HTTP = requests.Session()
+HTTP.headers.update({"User-Agent": "Mozilla/5.0"})
+HTTP.mount(
+    "https://",
+    HTTPAdapter(pool_connections=32, pool_maxsize=HTTP_POOL_SIZE, max_retries=Retry(total=3, backoff_factor=0.2)),
+)
+# Parallel playlist pagination can trip api.spotify.com rate limits; back off per page instead of
+# abandoning the API result. raise_on_status=False hands the last 429/5xx back as a normal response.
+HTTP.mount(
+    "https://api.spotify.com/",
+    HTTPAdapter(
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        ),
+    ),
+)
+
+_RE_SPOTIFY_URL = re.compile(r"https?://(open\.)?spotify\.com/", re.IGNORECASE)
+_RE_YT_URL = re.compile(r"https?://(www\.)?(youtube\.com|youtu\.be)/", re.IGNORECASE)
+_RE_SPOTIFY_ITEM = re.compile(r"spotify\.com/(?:embed/)?(track|album|playlist|episode|show)/([a-zA-Z0-9]+)", re.IGNORECASE)
+_RE_SPOTIFY_TRACK_URI = re.compile(r"spotify:track:([A-Za-z0-9]+)")
+_RE_ISO8601 = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+_RE_NORMALIZE = re.compile(r"[^a-z0-9]+")
+_RE_SAFE = re.compile(r"[^a-zA-Z0-9 _\-\.]+")
+
+_AUDIO_EXTS = (".m4a", ".opus", ".webm", ".mp3")
+
+_COOKIE_STRIP = str.maketrans("", "", "\n\r")
+
+_BAD_TERMS = ("live", "remix", "slowed", "sped up", "karaoke", "8d", "lyrics")
+_GOOD_TERMS = ("official", "topic", "auto generated by youtube")
+
+
+class LargeFileResponse(FileResponse):
+    # Read 1 MB per chunk instead of Starlette's 64 KB to cut per-read overhead on large files.
+    chunk_size = 1024 * 1024
 
 
 @dataclass
@@ -65,21 +129,35 @@ class MediaMeta:
     youtube_id: Optional[str] = None
     channel: Optional[str] = None
     extra_tags: dict[str, str] = field(default_factory=dict)
+    safe_name: Optional[str] = None
 
 
 def _is_spotify_url(value: str) -> bool:
-    return bool(re.search(r"https?://(open\.)?spotify\.com/", value, re.IGNORECASE))
+    return bool(_RE_SPOTIFY_URL.search(value))
 
 
 def _is_youtube_url(value: str) -> bool:
-    return bool(re.search(r"https?://(www\.)?(youtube\.com|youtu\.be)/", value, re.IGNORECASE))
+    return bool(_RE_YT_URL.search(value))
 
 
 def _is_spotify_playlist_url(value: str) -> bool:
-    return bool(re.search(r"spotify\.com/playlist/", value, re.IGNORECASE))
+    return _parse_spotify(value)[0] == "playlist"
 
 
 def _yt_dlp_cookiefile() -> Optional[str]:
+    # Env values are fixed per process; only re-check periodically in case the file is rotated.
+    checked_at = float(YTDLP_COOKIEFILE_CACHE.get("checked_at") or 0.0)
+    if checked_at and time.time() - checked_at < YTDLP_COOKIEFILE_TTL:
+        resolved = YTDLP_COOKIEFILE_CACHE.get("resolved")
+        return str(resolved) if resolved else None
+
+    resolved = _resolve_yt_dlp_cookiefile()
+    YTDLP_COOKIEFILE_CACHE["resolved"] = resolved
+    YTDLP_COOKIEFILE_CACHE["checked_at"] = time.time()
+    return resolved
+
+
+def _resolve_yt_dlp_cookiefile() -> Optional[str]:
     direct = os.getenv("YTDLP_COOKIES", "").strip()
     if direct and os.path.exists(direct):
         return direct
@@ -90,11 +168,11 @@ def _yt_dlp_cookiefile() -> Optional[str]:
 
     with YTDLP_COOKIEFILE_LOCK:
         cached = YTDLP_COOKIEFILE_CACHE.get("path")
-        if cached and os.path.exists(cached):
-            return cached
+        if cached and os.path.exists(str(cached)):
+            return str(cached)
 
         # Some deploy panels append punctuation or whitespace around env values.
-        clean = encoded.strip().strip("%").replace("\n", "").replace("\r", "")
+        clean = encoded.strip().strip("%").translate(_COOKIE_STRIP)
         if not clean:
             return None
 
@@ -103,49 +181,65 @@ def _yt_dlp_cookiefile() -> Optional[str]:
         except (binascii.Error, ValueError):
             return None
 
-        try:
-            text = raw.decode("utf-8")
-        except UnicodeDecodeError:
-            return None
-
-        if "# Netscape HTTP Cookie File" not in text:
+        if b"# Netscape HTTP Cookie File" not in raw:
             return None
 
         fd, path = tempfile.mkstemp(prefix="yt-cookies-", suffix=".txt")
-        os.close(fd)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(text)
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
         os.chmod(path, 0o600)
         YTDLP_COOKIEFILE_CACHE["path"] = path
         return path
 
 
-def _fetch_soup(url: str) -> Optional[BeautifulSoup]:
+def _fetch_html(url: str) -> Optional[lxml_html.HtmlElement]:
     try:
-        r = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
+        r = HTTP.get(url, timeout=15)
     except requests.RequestException:
         return None
     if r.status_code != 200:
         return None
-    return BeautifulSoup(r.text, "html.parser")
+    try:
+        # Honour an explicit Content-Type charset; libxml2 would otherwise assume Latin-1 without
+        # <meta charset>. requests reports ISO-8859-1 when no charset is sent, so default to UTF-8 then.
+        declared = "charset" in r.headers.get("Content-Type", "").lower()
+        encoding = r.encoding if declared and r.encoding else "utf-8"
+        return lxml_html.fromstring(r.content, parser=lxml_html.HTMLParser(encoding=encoding))
+    except (etree.ParserError, ValueError):
+        return None
 
 
 def _get_oembed(url: str) -> dict:
+    # oEmbed payloads are effectively immutable per URL, so repeat jobs can skip the network.
+    with OEMBED_CACHE_LOCK:
+        cached = OEMBED_CACHE.get(url)
+        if cached and time.time() - cached[0] < OEMBED_CACHE_TTL:
+            OEMBED_CACHE.move_to_end(url)
+            return cached[1]
+
     try:
-        r = requests.get("https://open.spotify.com/oembed", params={"url": url}, timeout=15)
+        r = HTTP.get("https://open.spotify.com/oembed", params={"url": url}, timeout=15)
     except requests.RequestException:
         return {}
     if r.status_code != 200:
         return {}
     try:
-        return r.json()
-    except ValueError:
+        payload = orjson.loads(r.content)
+    except orjson.JSONDecodeError:
         return {}
 
+    if payload:
+        with OEMBED_CACHE_LOCK:
+            OEMBED_CACHE[url] = (time.time(), payload)
+            OEMBED_CACHE.move_to_end(url)
+            while len(OEMBED_CACHE) > OEMBED_CACHE_SIZE:
+                OEMBED_CACHE.popitem(last=False)
+    return payload
+
 
 def _fallback_spotify_meta(url: str) -> MediaMeta:
-    kind = _spotify_kind(url) or "spotify"
-    spotify_id = _spotify_id(url)
+    kind, spotify_id = _parse_spotify(url)
+    kind = kind or "spotify"
     if kind == "playlist":
         title = "Spotify Playlist"
     elif kind == "track":
@@ -167,11 +261,14 @@ def _fallback_spotify_meta(url: str) -> MediaMeta:
     )
 
 
-def _parse_open_graph(soup: Optional[BeautifulSoup]) -> dict:
-    if not soup:
+def _parse_open_graph(tree: Optional[lxml_html.HtmlElement]) -> dict:
+    if tree is None:
         return {}
     og = {}
-    for tag in soup.find_all("meta"):
+    for tag in tree.xpath(
+        "//meta[starts-with(@property,'og:') or starts-with(@property,'music:')"
+        " or starts-with(@name,'og:') or starts-with(@name,'music:')]"
+    ):
         prop = tag.get("property") or tag.get("name")
         content = tag.get("content")
         if not prop or not content:
@@ -181,17 +278,17 @@ def _parse_open_graph(soup: Optional[BeautifulSoup]) -> dict:
     return og
 
 
-def _parse_json_ld(soup: Optional[BeautifulSoup]) -> list[dict]:
-    if not soup:
+def _parse_json_ld(tree: Optional[lxml_html.HtmlElement]) -> list[dict]:
+    if tree is None:
         return []
     items: list[dict] = []
-    for script in soup.find_all("script", attrs={"type": "application/ld+json"}):
-        text = (script.string or "").strip()
+    for raw in tree.xpath("//script[@type='application/ld+json']/text()"):
+        text = raw.strip()
         if not text:
             continue
         try:
-            payload = json.loads(text)
-        except json.JSONDecodeError:
+            payload = orjson.loads(text)
+        except orjson.JSONDecodeError:
             continue
         if isinstance(payload, dict):
             items.append(payload)
@@ -208,16 +305,11 @@ def _parse_artist_and_title(raw_title: str) -> tuple[Optional[str], str]:
     return None, raw_title.strip()
 
 
-def _spotify_id(url: str) -> Optional[str]:
-    m = re.search(r"spotify\.com/(track|album|playlist|episode|show)/([a-zA-Z0-9]+)", url)
+def _parse_spotify(url: str) -> tuple[Optional[str], Optional[str]]:
+    m = _RE_SPOTIFY_ITEM.search(url)
     if not m:
-        return None
-    return m.group(2)
-
-
-def _spotify_kind(url: str) -> Optional[str]:
-    m = re.search(r"spotify\.com/(track|album|playlist|episode|show)/", url)
-    return m.group(1) if m else None
+        return None, None
+    return m.group(1).lower(), m.group(2)
 
 
 def _best_spotify_cover_url(oembed: dict, og: dict) -> Optional[str]:
@@ -225,13 +317,6 @@ def _best_spotify_cover_url(oembed: dict, og: dict) -> Optional[str]:
     return og.get("og:image") or oembed.get("thumbnail_url")
 
 
-def _spotify_playlist_id(url: str) -> Optional[str]:
-    m = re.search(r"spotify\.com/playlist/([a-zA-Z0-9]+)", url)
-    if not m:
-        return None
-    return m.group(1)
-
-
 def _extract_spotify_json_ld_info(json_ld_items: list[dict]) -> dict:
     info: dict[str, Optional[str]] = {}
     for item in json_ld_items:
@@ -244,13 +329,15 @@ def _extract_spotify_json_ld_info(json_ld_items: list[dict]) -> dict:
             info["release_date"] = item.get("datePublished")
         if item.get("description") and not info.get("description"):
             info["description"] = item.get("description")
+        if len(info) == 4:
+            break
     return info
 
 
 def _iso8601_to_seconds(value: Optional[str]) -> Optional[int]:
     if not value:
         return None
-    match = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", value)
+    match = _RE_ISO8601.match(value)
     if not match:
         return None
     hours = int(match.group(1) or 0)
@@ -266,47 +353,66 @@ def _spotify_client_credentials() -> tuple[Optional[str], Optional[str]]:
     return client_id, client_secret
 
 
+def _cached_spotify_token() -> Optional[str]:
+    cached = SPOTIFY_TOKEN_CACHE.get("access_token")
+    if cached and float(SPOTIFY_TOKEN_CACHE.get("expires_at", 0.0)) > time.time() + SPOTIFY_TOKEN_MARGIN:
+        return str(cached)
+    return None
+
+
 def _spotify_access_token() -> Optional[str]:
     client_id, client_secret = _spotify_client_credentials()
     if not client_id or not client_secret:
         return None
 
-    now = time.time()
-    cached = SPOTIFY_TOKEN_CACHE.get("access_token")
-    if cached and float(SPOTIFY_TOKEN_CACHE.get("expires_at", 0.0)) > now + 30:
-        return str(cached)
+    cached = _cached_spotify_token()
+    if cached:
+        return cached
 
-    token_res = requests.post(
-        "https://accounts.spotify.com/api/token",
-        data={"grant_type": "client_credentials"},
-        auth=(client_id, client_secret),
-        timeout=15,
-    )
-    if token_res.status_code != 200:
-        return None
+    with SPOTIFY_TOKEN_LOCK:
+        # Another thread may have refreshed the token while we waited.
+        cached = _cached_spotify_token()
+        if cached:
+            return cached
 
-    payload = token_res.json()
-    access_token = payload.get("access_token")
-    expires_in = int(payload.get("expires_in", 3600))
-    if not access_token:
-        return None
+        now = time.time()
+        token_res = HTTP.post(
+            "https://accounts.spotify.com/api/token",
+            data={"grant_type": "client_credentials"},
+            auth=(client_id, client_secret),
+            timeout=15,
+        )
+        if token_res.status_code != 200:
+            return None
 
-    SPOTIFY_TOKEN_CACHE["access_token"] = access_token
-    SPOTIFY_TOKEN_CACHE["expires_at"] = now + expires_in
-    return str(access_token)
+        try:
+            payload = orjson.loads(token_res.content)
+        except orjson.JSONDecodeError:
+            return None
+        access_token = payload.get("access_token")
+        expires_in = int(payload.get("expires_in", 3600))
+        if not access_token:
+            return None
+
+        SPOTIFY_TOKEN_CACHE["access_token"] = access_token
+        SPOTIFY_TOKEN_CACHE["expires_at"] = now + expires_in
+        return str(access_token)
 
 
 def resolve_spotify(url: str) -> MediaMeta:
-    soup = _fetch_soup(url)
-    oembed = _get_oembed(url)
-    og = _parse_open_graph(soup)
-    json_ld = _parse_json_ld(soup)
+    kind, spotify_id = _parse_spotify(url)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        tree_future = executor.submit(_fetch_html, url)
+        oembed_future = executor.submit(_get_oembed, url)
+        tree, oembed = tree_future.result(), oembed_future.result()
+    og = _parse_open_graph(tree)
+    json_ld = _parse_json_ld(tree)
     ld_info = _extract_spotify_json_ld_info(json_ld)
 
     title = oembed.get("title") or og.get("og:title") or "Spotify Item"
     artist = oembed.get("author_name") or ld_info.get("artist")
     cover_url = _best_spotify_cover_url(oembed, og)
-    media_type = oembed.get("type") or og.get("og:type") or _spotify_kind(url)
+    media_type = oembed.get("type") or og.get("og:type") or kind
     album = og.get("music:album")
 
     if not artist and title:
@@ -328,7 +434,6 @@ def resolve_spotify(url: str) -> MediaMeta:
         query_parts.append(artist)
 
     extra_tags: dict[str, str] = {}
-    spotify_id = _spotify_id(url)
     if spotify_id:
         extra_tags["Spotify ID"] = spotify_id
     extra_tags["Spotify URL"] = url
@@ -349,7 +454,27 @@ def resolve_spotify(url: str) -> MediaMeta:
     )
 
 
-def _youtube_info(target: str, search: bool = False) -> dict:
+def _freeze_opts(value):
+    if isinstance(value, dict):
+        return frozenset((key, _freeze_opts(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_opts(item) for item in value)
+    return value
+
+
+def _get_ydl(opts: dict) -> YoutubeDL:
+    # YoutubeDL instances are not thread-safe, so each worker thread keeps its own warm set.
+    cache = getattr(YDL_CACHE, "instances", None)
+    if cache is None:
+        cache = YDL_CACHE.instances = {}
+    key = _freeze_opts(opts)
+    ydl = cache.get(key)
+    if ydl is None:
+        ydl = cache[key] = YoutubeDL(opts)
+    return ydl
+
+
+def _yt_dlp_info_opts() -> dict:
     opts = {
         "quiet": True,
         "no_warnings": True,
@@ -361,115 +486,108 @@ def _youtube_info(target: str, search: bool = False) -> dict:
     cookiefile = _yt_dlp_cookiefile()
     if cookiefile:
         opts["cookiefile"] = cookiefile
+    return opts
 
-    with YoutubeDL(opts) as ydl:
-        if search:
-            result = ydl.extract_info(f"ytsearch1:{target}", download=False)
-            if not result or "entries" not in result or not result["entries"]:
-                raise HTTPException(status_code=404, detail="No YouTube match found")
-            return result["entries"][0]
-        return ydl.extract_info(target, download=False)
 
+def _youtube_info(target: str, search: bool = False) -> dict:
+    ydl = _get_ydl(_yt_dlp_info_opts())
+    if search:
+        result = ydl.extract_info(f"ytsearch1:{target}", download=False)
+        if not result or "entries" not in result or not result["entries"]:
+            raise HTTPException(status_code=404, detail="No YouTube match found")
+        return result["entries"][0]
+    return ydl.extract_info(target, download=False)
 
-def _best_youtube_cover_url(info: dict) -> Optional[str]:
-    thumbs = info.get("thumbnails") or []
-    best_url = None
-    best_area = -1
 
-    for item in thumbs:
-        if not isinstance(item, dict):
-            continue
-        thumb_url = item.get("url")
-        if not thumb_url:
-            continue
-        width = int(item.get("width") or 0)
-        height = int(item.get("height") or 0)
-        area = width * height
-        if area > best_area:
-            best_area = area
-            best_url = thumb_url
+def _cover_url_exists(url: str) -> bool:
+    try:
+        return HTTP.head(url, timeout=5).status_code == 200
+    except requests.RequestException:
+        return False
 
-    if best_url:
-        return best_url
+
+def _best_youtube_cover_url(info: dict) -> Optional[str]:
+    thumbs = info.get("thumbnails") or []
+    best = max(
+        (item for item in thumbs if isinstance(item, dict) and item.get("url")),
+        key=lambda item: int(item.get("width") or 0) * int(item.get("height") or 0),
+        default=None,
+    )
+    if best:
+        return best["url"]
 
     video_id = info.get("id")
     if video_id:
-        # Fallback candidates in descending quality.
-        for suffix in ["maxresdefault.jpg", "sddefault.jpg", "hqdefault.jpg"]:
-            candidate = f"https://i.ytimg.com/vi/{video_id}/{suffix}"
-            try:
-                res = requests.head(candidate, timeout=5)
-                if res.status_code == 200:
-                    return candidate
-            except requests.RequestException:
-                continue
+        # Fallback candidates in descending quality, probed concurrently.
+        candidates = [
+            f"https://i.ytimg.com/vi/{video_id}/{suffix}"
+            for suffix in ["maxresdefault.jpg", "sddefault.jpg", "hqdefault.jpg"]
+        ]
+        with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+            results = list(executor.map(_cover_url_exists, candidates))
+        for candidate, exists in zip(candidates, results):
+            if exists:
+                return candidate
 
     return info.get("thumbnail")
 
 
 def _normalize_text(value: Optional[str]) -> str:
-    return re.sub(r"[^a-z0-9]+", " ", (value or "").lower()).strip()
+    return _RE_NORMALIZE.sub(" ", (value or "").lower()).strip()
+
+
+def _significant_tokens(value: Optional[str]) -> list[str]:
+    return [x for x in _normalize_text(value).split() if len(x) > 2]
 
 
-def _score_youtube_entry(entry: dict, meta: Optional[MediaMeta], query: str) -> int:
+def _score_youtube_entry(
+    entry: dict, match_tokens: list[str], artist_norm: Optional[str], duration_seconds: Optional[int]
+) -> int:
     title = _normalize_text(entry.get("title"))
     channel = _normalize_text(entry.get("channel") or entry.get("uploader"))
     full_text = f"{title} {channel}"
     score = 0
 
-    for bad in [" live ", " remix ", " slowed ", " sped up ", " karaoke ", " 8d ", " lyrics "]:
-        if bad.strip() in full_text:
-            score -= 8
-
-    for good in [" official ", " topic ", " auto generated by youtube "]:
-        if good.strip() in full_text:
-            score += 6
-
-    query_tokens = [x for x in _normalize_text(query).split() if len(x) > 2]
-    for token in query_tokens:
-        if token in title:
-            score += 2
+    score -= 8 * sum(1 for term in _BAD_TERMS if term in full_text)
+    score += 6 * sum(1 for term in _GOOD_TERMS if term in full_text)
+    score += 2 * sum(1 for token in match_tokens if token in title)
 
-    if meta:
-        if meta.artist and _normalize_text(meta.artist) in full_text:
+    if artist_norm is not None and artist_norm in full_text:
+        score += 8
+    if duration_seconds and entry.get("duration"):
+        diff = abs(int(entry["duration"]) - int(duration_seconds))
+        if diff <= 5:
             score += 8
-        if meta.title:
-            title_tokens = [x for x in _normalize_text(meta.title).split() if len(x) > 2]
-            for token in title_tokens:
-                if token in title:
-                    score += 2
-        if meta.duration_seconds and entry.get("duration"):
-            diff = abs(int(entry["duration"]) - int(meta.duration_seconds))
-            if diff <= 5:
-                score += 8
-            elif diff <= 15:
-                score += 4
-            elif diff > 45:
-                score -= 6
+        elif diff <= 15:
+            score += 4
+        elif diff > 45:
+            score -= 6
 
     return score
 
 
 def _search_best_youtube_entry(query: str, meta: Optional[MediaMeta] = None, count: int = 10) -> dict:
-    opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "noplaylist": True,
-        "extract_flat": False,
-        "skip_download": True,
-    }
-
-    cookiefile = _yt_dlp_cookiefile()
-    if cookiefile:
-        opts["cookiefile"] = cookiefile
-
-    with YoutubeDL(opts) as ydl:
-        result = ydl.extract_info(f"ytsearch{count}:{query}", download=False)
+    result = _get_ydl(_yt_dlp_info_opts()).extract_info(f"ytsearch{count}:{query}", download=False)
     entries = result.get("entries") or []
     if not entries:
         raise HTTPException(status_code=404, detail="No YouTube match found")
 
-    ranked = sorted(entries, key=lambda item: _score_youtube_entry(item, meta, query), reverse=True)
+    # Normalize the query and reference metadata once instead of per candidate.
+    match_tokens = _significant_tokens(query)
+    artist_norm = None
+    duration_seconds = None
+    if meta:
+        if meta.title:
+            match_tokens += _significant_tokens(meta.title)
+        if meta.artist:
+            artist_norm = _normalize_text(meta.artist)
+        duration_seconds = meta.duration_seconds
+
+    ranked = sorted(
+        entries,
+        key=lambda item: _score_youtube_entry(item, match_tokens, artist_norm, duration_seconds),
+        reverse=True,
+    )
     return ranked[0]
 
 
@@ -559,15 +677,18 @@ def _search_query(meta: MediaMeta) -> str:
     parts = [meta.title]
     if meta.artist:
         parts.append(meta.artist)
-    return " ".join(parts)
+    meta.query = " ".join(parts)
+    return meta.query
 
 
 def _safe_filename(meta: MediaMeta) -> str:
+    if meta.safe_name:
+        return meta.safe_name
     base = meta.title
     if meta.artist:
         base = f"{meta.artist} - {meta.title}"
-    base = re.sub(r"[^a-zA-Z0-9 _\-\.]+", "", base).strip()
-    return base or "download"
+    meta.safe_name = _RE_SAFE.sub("", base).strip() or "download"
+    return meta.safe_name
 
 
 def _embed_metadata(mp3_path: str, meta: MediaMeta):
@@ -583,13 +704,32 @@ def _embed_metadata(mp3_path: str, meta: MediaMeta):
 def _download_cover_bytes(meta: MediaMeta) -> tuple[Optional[bytes], Optional[str]]:
     if not meta.cover_url:
         return None, None
+
+    # Playlist tracks from the same album share a cover URL, so fetch each one once.
+    with COVER_CACHE_LOCK:
+        cached = COVER_CACHE.get(meta.cover_url)
+        if cached:
+            COVER_CACHE.move_to_end(meta.cover_url)
+            return cached
+
     try:
-        img = requests.get(meta.cover_url, timeout=15)
-        if img.status_code == 200:
-            return img.content, img.headers.get("Content-Type", "image/jpeg")
-    except requests.RequestException:
+        with HTTP.get(meta.cover_url, timeout=15, stream=True) as img:
+            if img.status_code != 200:
+                return None, None
+            # Read one byte past the cap so oversized covers can be detected and skipped.
+            data = img.raw.read(MAX_COVER_BYTES + 1, decode_content=True)
+            if not data or len(data) > MAX_COVER_BYTES:
+                return None, None
+            mime = img.headers.get("Content-Type", "image/jpeg")
+    except (requests.RequestException, Urllib3HTTPError):
         return None, None
-    return None, None
+
+    with COVER_CACHE_LOCK:
+        COVER_CACHE[meta.cover_url] = (data, mime)
+        COVER_CACHE.move_to_end(meta.cover_url)
+        while len(COVER_CACHE) > COVER_CACHE_SIZE:
+            COVER_CACHE.popitem(last=False)
+    return data, mime
 
 
 def _embed_metadata_mp3(mp3_path: str, meta: MediaMeta):
@@ -663,7 +803,8 @@ def _embed_metadata_m4a(file_path: str, meta: MediaMeta):
     audio.save()
 
 
-def _yt_dlp_opts(fmt: Optional[str], output_format: str) -> dict:
+@functools.lru_cache(maxsize=8)
+def _yt_dlp_base_opts(output_format: str, cookiefile: Optional[str]) -> tuple[tuple[str, Any], ...]:
     opts = {
         "outtmpl": "%(id)s.%(ext)s",
         "quiet": True,
@@ -680,11 +821,6 @@ def _yt_dlp_opts(fmt: Optional[str], output_format: str) -> dict:
         # Broaden available manifests for problematic videos.
         "extractor_args": {"youtube": {"player_client": ["android", "ios", "web"]}},
     }
-    if fmt:
-        opts["format"] = fmt
-    else:
-        # Avoid yt-dlp default bestvideo+bestaudio selection for audio workflows.
-        opts["format"] = "bestaudio/best"
     if output_format == "mp3":
         opts["postprocessors"] = [
             {"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "0"},
@@ -694,10 +830,16 @@ def _yt_dlp_opts(fmt: Optional[str], output_format: str) -> dict:
             {"key": "FFmpegExtractAudio", "preferredcodec": "opus", "preferredquality": "0"},
         ]
 
-    cookiefile = _yt_dlp_cookiefile()
     if cookiefile:
         opts["cookiefile"] = cookiefile
 
+    return tuple(opts.items())
+
+
+def _yt_dlp_opts(fmt: Optional[str], output_format: str) -> dict:
+    opts = dict(_yt_dlp_base_opts(output_format, _yt_dlp_cookiefile()))
+    # Avoid yt-dlp default bestvideo+bestaudio selection for audio workflows.
+    opts["format"] = fmt or "bestaudio/best"
     return opts
 
 
@@ -712,16 +854,16 @@ def _find_generated_audio(tmpdir: str, fallback_id: Optional[str], output_format
     if fallback_id:
         if preferred_ext:
             by_id = os.path.join(tmpdir, f"{fallback_id}{preferred_ext}")
-            if os.path.exists(by_id):
+            if os.path.isfile(by_id):
                 return by_id
-        for ext in [".m4a", ".opus", ".webm", ".mp3"]:
+        for ext in _AUDIO_EXTS:
             by_id_any = os.path.join(tmpdir, f"{fallback_id}{ext}")
-            if os.path.exists(by_id_any):
+            if os.path.isfile(by_id_any):
                 return by_id_any
-    for name in os.listdir(tmpdir):
-        lower = name.lower()
-        if lower.endswith((".m4a", ".opus", ".webm", ".mp3")):
-            return os.path.join(tmpdir, name)
+    with os.scandir(tmpdir) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(_AUDIO_EXTS):
+                return entry.path
     return None
 
 
@@ -761,19 +903,8 @@ def _is_requested_format_unavailable_error(exc: DownloadError) -> bool:
 
 
 def _extract_youtube_entry_for_retry(target: str) -> Optional[dict]:
-    opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "noplaylist": True,
-        "extract_flat": False,
-        "skip_download": True,
-    }
-    cookiefile = _yt_dlp_cookiefile()
-    if cookiefile:
-        opts["cookiefile"] = cookiefile
-
-    with YoutubeDL(opts) as ydl:
-        info = ydl.extract_info(target, download=False)
+    ydl = _get_ydl(_yt_dlp_info_opts())
+    info = ydl.extract_info(target, download=False)
 
     if not info:
         return None
@@ -795,8 +926,7 @@ def _extract_youtube_entry_for_retry(target: str) -> Optional[dict]:
     url = info.get("webpage_url") or info.get("url")
     if not url:
         return info
-    with YoutubeDL(opts) as ydl:
-        full = ydl.extract_info(str(url), download=False)
+    full = ydl.extract_info(str(url), download=False)
     return full if isinstance(full, dict) else info
 
 
@@ -950,29 +1080,81 @@ def download_from_input(value: str, output_format: str = "best") -> tuple[str, M
         _embed_metadata(file_path, meta)
         ext = os.path.splitext(file_path)[1].lower() or ".bin"
 
-        final_name = _safe_filename(meta) + ext
-        final_path = os.path.join(tmpdir, final_name)
-        os.rename(file_path, final_path)
-
         with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as stable:
-            with open(final_path, "rb") as f:
-                shutil.copyfileobj(f, stable)
             stable_path = stable.name
+        # Same filesystem in practice, so this is a rename rather than a byte copy.
+        shutil.move(file_path, stable_path)
 
     return stable_path, meta, ext
 
 
-def _resolve_playlist_with_spotify_api(url: str) -> tuple[dict, list[MediaMeta]]:
+def _env_workers(name: str, default: int, upper: int, total: int) -> int:
+    raw = os.getenv(name, str(default))
+    try:
+        workers = int(raw)
+    except ValueError:
+        workers = default
+    workers = max(1, min(workers, upper))
+    return min(workers, max(total, 1))
+
+
+def _resolve_workers(total_requests: int) -> int:
+    return _env_workers("PLAYLIST_RESOLVE_WORKERS", 16, HTTP_POOL_SIZE, total_requests)
+
+
+def _spotify_playlist_tracks_page(playlist_id: str, headers: dict, offset: int, limit: int) -> dict:
+    tracks_res = HTTP.get(
+        f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
+        params={
+            "offset": offset,
+            "limit": limit,
+            "fields": "items(track(name,id,artists(name),album(name,images(url),release_date),duration_ms,disc_number,track_number,external_ids(isrc),external_urls(spotify)))",
+        },
+        headers=headers,
+        timeout=20,
+    )
+    if tracks_res.status_code != 200:
+        raise HTTPException(status_code=tracks_res.status_code, detail="Spotify API playlist tracks failed")
+    return orjson.loads(tracks_res.content)
+
+
+def _spotify_api_track_meta(track: dict, playlist_url: str) -> MediaMeta:
+    name = track.get("name")
+    artist_names = ", ".join(filter(None, (a.get("name") for a in track.get("artists") or ())))
+    album = track.get("album") or {}
+    images = album.get("images") or ()
+    spotify_url = (track.get("external_urls") or {}).get("spotify")
+    duration_ms = track.get("duration_ms")
+    tag_values = (
+        ("Spotify ID", track.get("id")),
+        ("Spotify URL", spotify_url),
+        ("ISRC", (track.get("external_ids") or {}).get("isrc")),
+    )
+
+    return MediaMeta(
+        input_text=spotify_url or playlist_url,
+        source="spotify",
+        title=name,
+        artist=artist_names or None,
+        album=album.get("name"),
+        cover_url=images[0].get("url") if images else None,
+        media_type="spotify_track",
+        query=f"{name} {artist_names}" if artist_names else name,
+        duration_seconds=duration_ms // 1000 if duration_ms else None,
+        release_date=album.get("release_date"),
+        track_number=track.get("track_number"),
+        disc_number=track.get("disc_number"),
+        extra_tags={key: str(value) for key, value in tag_values if value},
+    )
+
+
+def _resolve_playlist_with_spotify_api(url: str, playlist_id: str) -> tuple[dict, list[MediaMeta]]:
     token = _spotify_access_token()
     if not token:
         raise HTTPException(status_code=401, detail="Spotify credentials not configured")
 
-    playlist_id = _spotify_playlist_id(url)
-    if not playlist_id:
-        raise HTTPException(status_code=400, detail="Invalid Spotify playlist URL")
-
     headers = {"Authorization": f"Bearer {token}"}
-    meta_res = requests.get(
+    meta_res = HTTP.get(
         f"https://api.spotify.com/v1/playlists/{playlist_id}",
         params={"fields": "name,images(url),external_urls(spotify),tracks(total)"},
         headers=headers,
@@ -981,69 +1163,24 @@ def _resolve_playlist_with_spotify_api(url: str) -> tuple[dict, list[MediaMeta]]
     if meta_res.status_code != 200:
         raise HTTPException(status_code=meta_res.status_code, detail="Spotify API playlist metadata failed")
 
-    playlist = meta_res.json()
-    tracks: list[MediaMeta] = []
-    offset = 0
+    playlist = orjson.loads(meta_res.content)
     limit = 100
-
-    while True:
-        tracks_res = requests.get(
-            f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
-            params={
-                "offset": offset,
-                "limit": limit,
-                "fields": "items(track(name,id,artists(name),album(name,images(url),release_date),duration_ms,disc_number,track_number,external_ids(isrc),external_urls(spotify))),next",
-            },
-            headers=headers,
-            timeout=20,
+    # The metadata response already carries the total, so every page can be requested at once.
+    total = int((playlist.get("tracks") or {}).get("total") or 0)
+    offsets = list(range(0, total, limit)) or [0]
+    # api.spotify.com rate-limits per client, so pages keep a tighter cap than oEmbed lookups.
+    workers = min(SPOTIFY_PAGE_WORKERS, _resolve_workers(len(offsets)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pages = list(
+            executor.map(lambda offset: _spotify_playlist_tracks_page(playlist_id, headers, offset, limit), offsets)
         )
-        if tracks_res.status_code != 200:
-            raise HTTPException(status_code=tracks_res.status_code, detail="Spotify API playlist tracks failed")
-
-        payload = tracks_res.json()
-        items = payload.get("items", [])
-        for item in items:
-            track = item.get("track") or {}
-            if not track or not track.get("name"):
-                continue
 
-            artist_names = ", ".join([a.get("name") for a in track.get("artists", []) if a.get("name")])
-            album = track.get("album", {})
-            images = album.get("images", [])
-            cover_url = images[0].get("url") if images else None
-            spotify_url = (track.get("external_urls") or {}).get("spotify")
-            spotify_id = track.get("id")
-            isrc = (track.get("external_ids") or {}).get("isrc")
-
-            tags: dict[str, str] = {}
-            if spotify_id:
-                tags["Spotify ID"] = str(spotify_id)
-            if spotify_url:
-                tags["Spotify URL"] = str(spotify_url)
-            if isrc:
-                tags["ISRC"] = str(isrc)
-
-            tracks.append(
-                MediaMeta(
-                    input_text=spotify_url or url,
-                    source="spotify",
-                    title=track.get("name"),
-                    artist=artist_names or None,
-                    album=album.get("name"),
-                    cover_url=cover_url,
-                    media_type="spotify_track",
-                    query=" ".join([x for x in [track.get("name"), artist_names] if x]),
-                    duration_seconds=(track.get("duration_ms") or 0) // 1000 if track.get("duration_ms") else None,
-                    release_date=album.get("release_date"),
-                    track_number=track.get("track_number"),
-                    disc_number=track.get("disc_number"),
-                    extra_tags=tags,
-                )
-            )
-
-        if not payload.get("next") or not items:
-            break
-        offset += limit
+    tracks = [
+        _spotify_api_track_meta(track, url)
+        for payload in pages
+        for track in (item.get("track") for item in payload.get("items") or ())
+        if track and track.get("name")
+    ]
 
     playlist_info = {
         "title": playlist.get("name") or "Spotify Playlist",
@@ -1055,48 +1192,60 @@ def _resolve_playlist_with_spotify_api(url: str) -> tuple[dict, list[MediaMeta]]
 
 
 def _resolve_playlist_without_credentials(url: str) -> tuple[dict, list[MediaMeta]]:
-    page = requests.get(url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
-    if page.status_code != 200:
-        raise HTTPException(status_code=page.status_code, detail="Playlist page is not accessible")
-
-    track_ids = re.findall(r"spotify:track:([A-Za-z0-9]+)", page.text)
-    if not track_ids:
-        raise HTTPException(status_code=404, detail="No playlist tracks found in public page")
-
-    # Keep order and remove duplicates from the page payload.
-    ordered_track_ids = list(dict.fromkeys(track_ids))
-    playlist_oembed = _get_oembed(url)
-    playlist_title = playlist_oembed.get("title") or "Spotify Playlist"
-    playlist_cover = playlist_oembed.get("thumbnail_url")
-
-    tracks: list[MediaMeta] = []
-    for idx, track_id in enumerate(ordered_track_ids, start=1):
-        track_url = f"https://open.spotify.com/track/{track_id}"
-        track_oembed = _get_oembed(track_url)
-        raw_title = track_oembed.get("title") or f"Track {idx}"
-        artist = track_oembed.get("author_name")
-        title = raw_title
-
-        if not artist and raw_title:
-            parsed_artist, parsed_title = _parse_artist_and_title(raw_title)
-            artist = parsed_artist
-            title = parsed_title
-
-        tags = {"Spotify ID": track_id, "Spotify URL": track_url}
-        tracks.append(
-            MediaMeta(
-                input_text=track_url,
-                source="spotify",
-                title=title,
-                artist=artist,
-                album=None,
-                cover_url=track_oembed.get("thumbnail_url") or playlist_cover,
-                media_type="spotify_track",
-                query=" ".join([x for x in [title, artist] if x]),
-                track_number=idx,
-                extra_tags=tags,
-            )
-        )
+    # Per-call pool so one large playlist can't hold up other jobs' lookups.
+    with ThreadPoolExecutor(max_workers=_resolve_workers(HTTP_POOL_SIZE)) as executor:
+        try:
+            # The playlist oEmbed only needs the URL, so let it overlap the page download.
+            playlist_oembed_future = executor.submit(_get_oembed, url)
+            page = HTTP.get(url, timeout=20)
+            if page.status_code != 200:
+                raise HTTPException(status_code=page.status_code, detail="Playlist page is not accessible")
+
+            # Keep order and remove duplicates from the page payload in a single scan.
+            ordered_track_ids = list(dict.fromkeys(m.group(1) for m in _RE_SPOTIFY_TRACK_URI.finditer(page.text)))
+            if not ordered_track_ids:
+                raise HTTPException(status_code=404, detail="No playlist tracks found in public page")
+            track_urls = [f"https://open.spotify.com/track/{track_id}" for track_id in ordered_track_ids]
+
+            # One oEmbed round-trip per track; queue them all now and collect in page order below.
+            track_oembed_futures = [executor.submit(_get_oembed, track_url) for track_url in track_urls]
+            playlist_oembed = playlist_oembed_future.result()
+            playlist_title = playlist_oembed.get("title") or "Spotify Playlist"
+            playlist_cover = playlist_oembed.get("thumbnail_url")
+
+            tracks: list[MediaMeta] = []
+            for idx, (track_id, track_url, track_oembed_future) in enumerate(
+                zip(ordered_track_ids, track_urls, track_oembed_futures), start=1
+            ):
+                track_oembed = track_oembed_future.result()
+                raw_title = track_oembed.get("title") or f"Track {idx}"
+                artist = track_oembed.get("author_name")
+                title = raw_title
+
+                if not artist and raw_title:
+                    parsed_artist, parsed_title = _parse_artist_and_title(raw_title)
+                    artist = parsed_artist
+                    title = parsed_title
+
+                tags = {"Spotify ID": track_id, "Spotify URL": track_url}
+                tracks.append(
+                    MediaMeta(
+                        input_text=track_url,
+                        source="spotify",
+                        title=title,
+                        artist=artist,
+                        album=None,
+                        cover_url=track_oembed.get("thumbnail_url") or playlist_cover,
+                        media_type="spotify_track",
+                        query=" ".join([x for x in [title, artist] if x]),
+                        track_number=idx,
+                        extra_tags=tags,
+                    )
+                )
+        except BaseException:
+            # Don't keep fetching oEmbeds for a resolution that already failed.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
 
     playlist_info = {
         "title": playlist_title,
@@ -1108,47 +1257,100 @@ def _resolve_playlist_without_credentials(url: str) -> tuple[dict, list[MediaMet
 
 
 def resolve_playlist(url: str) -> tuple[dict, list[MediaMeta]]:
-    if not _is_spotify_playlist_url(url):
+    kind, playlist_id = _parse_spotify(url)
+    if kind != "playlist" or not playlist_id:
         raise HTTPException(status_code=400, detail="Input must be a Spotify playlist URL")
 
     try:
-        return _resolve_playlist_with_spotify_api(url)
+        return _resolve_playlist_with_spotify_api(url, playlist_id)
     except HTTPException:
         return _resolve_playlist_without_credentials(url)
 
 
-def _set_job(job_id: str, updates: dict):
+def _job_entry(job_id: str) -> Optional[dict]:
+    # The registry lock only guards the dict itself; each job carries its own lock for updates.
     with PLAYLIST_JOBS_LOCK:
-        if job_id not in PLAYLIST_JOBS:
-            return
-        PLAYLIST_JOBS[job_id].update(updates)
+        return PLAYLIST_JOBS.get(job_id)
+
+
+def _job_snapshot(job_id: str) -> Optional[dict]:
+    job = _job_entry(job_id)
+    if not job:
+        return None
+    with job["lock"]:
+        snapshot = dict(job)
+        snapshot["files"] = list(job["files"])
+        snapshot["tracks"] = list(job["tracks"])
+    return snapshot
+
+
+def _job_status_payload(job: dict) -> dict:
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "total": job["total"],
+        "done": job["done"],
+        "failed": job["failed"],
+        "current": job["current"],
+        "error": job["error"],
+        "playlist_title": job["playlist_title"],
+        "cover_url": job["cover_url"],
+        "source_mode": job["source_mode"],
+        "output_format": job.get("output_format"),
+        "files": [
+            {
+                "id": item["id"],
+                "index": item["index"],
+                "title": item["title"],
+                "artist": item["artist"],
+                "filename": item["filename"],
+            }
+            for item in (job.get("files") or [])
+        ],
+        "tracks": [
+            {
+                "id": item["id"],
+                "index": item["index"],
+                "title": item["title"],
+                "artist": item["artist"],
+            }
+            for item in (job.get("tracks") or [])
+        ],
+        "ready": bool(job["zip_path"] and job["status"] == "done"),
+    }
+
+
+def _set_job(job_id: str, updates: dict):
+    job = _job_entry(job_id)
+    if not job:
+        return
+    with job["lock"]:
+        job.update(updates)
+        job["status_body"] = None
 
 
 def _append_job_file(job_id: str, file_entry: dict):
-    with PLAYLIST_JOBS_LOCK:
-        if job_id not in PLAYLIST_JOBS:
-            return
-        PLAYLIST_JOBS[job_id]["files"].append(file_entry)
+    job = _job_entry(job_id)
+    if not job:
+        return
+    with job["lock"]:
+        job["files"].append(file_entry)
+        job["status_body"] = None
 
 
 def _playlist_workers(total_tracks: int) -> int:
-    raw = os.getenv("PLAYLIST_WORKERS", "3")
-    try:
-        workers = int(raw)
-    except ValueError:
-        workers = 3
-    workers = max(1, min(workers, 8))
-    return min(workers, max(total_tracks, 1))
+    return _env_workers("PLAYLIST_WORKERS", 3, 8, total_tracks)
 
 
 def _download_playlist_track(idx: int, track: MediaMeta, files_dir: str, output_format: str) -> dict:
-    with tempfile.TemporaryDirectory() as tmpdir:
+    # Scratch dir lives inside the job dir so the final move is a same-filesystem rename.
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(files_dir)) as tmpdir:
         file_path = _download_audio(track, tmpdir, output_format=output_format)
         _embed_metadata(file_path, track)
         ext = os.path.splitext(file_path)[1].lower() or ".bin"
         output_name = f"{idx:03d} - {_safe_filename(track)}{ext}"
         output_path = os.path.join(files_dir, output_name)
-        shutil.copy2(file_path, output_path)
+        os.replace(file_path, output_path)
     return {
         "id": str(idx),
         "index": idx,
@@ -1195,31 +1397,38 @@ def _run_playlist_job(job_id: str, playlist_url: str, output_format: str):
         workers = _playlist_workers(total)
         _set_job(job_id, {"current": f"Procesando en paralelo ({workers} workers)"})
 
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            job_map = {
-                executor.submit(_download_playlist_track, idx, track, files_dir, output_format): (idx, track)
-                for idx, track in enumerate(tracks, start=1)
-            }
-            for future in as_completed(job_map):
-                try:
-                    file_entry = future.result()
-                    _append_job_file(job_id, file_entry)
-                    success_count += 1
-                except Exception:
-                    failed_count += 1
-                _set_job(job_id, {"done": success_count, "failed": failed_count})
-
-        created_files = [name for name in os.listdir(files_dir) if name.lower().endswith((".mp3", ".m4a", ".opus", ".webm"))]
-        if not created_files:
+        zip_name = _RE_SAFE.sub("", str(playlist_info.get("title") or "playlist")).strip() or "playlist"
+        zip_path = os.path.join(job_dir, f"{zip_name}.zip")
+
+        # Archive each track as soon as it lands so zipping overlaps the remaining downloads.
+        # Only this thread writes to the archive; source files stay for per-track downloads.
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                job_map = {
+                    executor.submit(_download_playlist_track, idx, track, files_dir, output_format): (idx, track)
+                    for idx, track in enumerate(tracks, start=1)
+                }
+                for future in as_completed(job_map):
+                    try:
+                        file_entry = future.result()
+                    except Exception:
+                        failed_count += 1
+                    else:
+                        _append_job_file(job_id, file_entry)
+                        try:
+                            zf.write(file_entry["path"], arcname=file_entry["filename"])
+                        except Exception:
+                            # Archive errors fail the whole job; don't keep downloading the rest.
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            raise
+                        success_count += 1
+                    _set_job(job_id, {"done": success_count, "failed": failed_count})
+
+        if not success_count:
+            os.remove(zip_path)
             _set_job(job_id, {"status": "failed", "error": "No tracks were downloaded"})
             return
 
-        zip_name = re.sub(r"[^a-zA-Z0-9 _\-\.]+", "", str(playlist_info.get("title") or "playlist")).strip() or "playlist"
-        zip_path = os.path.join(job_dir, f"{zip_name}.zip")
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-            for name in sorted(created_files):
-                zf.write(os.path.join(files_dir, name), arcname=name)
-
         _set_job(
             job_id,
             {
@@ -1307,6 +1516,8 @@ async def playlist_start(payload: dict):
             "source_mode": None,
             "output_format": output_format,
             "created_at": int(time.time()),
+            "lock": threading.Lock(),
+            "status_body": None,
         }
 
     thread = threading.Thread(target=_run_playlist_job, args=(job_id, str(value), output_format), daemon=True)
@@ -1317,52 +1528,21 @@ async def playlist_start(payload: dict):
 
 @app.get("/api/playlist/status/{job_id}")
 async def playlist_status(job_id: str):
-    with PLAYLIST_JOBS_LOCK:
-        job = PLAYLIST_JOBS.get(job_id)
+    job = _job_entry(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Playlist job not found")
 
-    return JSONResponse(
-        {
-            "id": job["id"],
-            "status": job["status"],
-            "total": job["total"],
-            "done": job["done"],
-            "failed": job["failed"],
-            "current": job["current"],
-            "error": job["error"],
-            "playlist_title": job["playlist_title"],
-            "cover_url": job["cover_url"],
-            "source_mode": job["source_mode"],
-            "output_format": job.get("output_format"),
-            "files": [
-                {
-                    "id": item["id"],
-                    "index": item["index"],
-                    "title": item["title"],
-                    "artist": item["artist"],
-                    "filename": item["filename"],
-                }
-                for item in (job.get("files") or [])
-            ],
-            "tracks": [
-                {
-                    "id": item["id"],
-                    "index": item["index"],
-                    "title": item["title"],
-                    "artist": item["artist"],
-                }
-                for item in (job.get("tracks") or [])
-            ],
-            "ready": bool(job["zip_path"] and job["status"] == "done"),
-        }
-    )
+    with job["lock"]:
+        # Rebuilt only after the job changes, so frequent polling is a cached bytes lookup.
+        body = job.get("status_body")
+        if body is None:
+            body = job["status_body"] = orjson.dumps(_job_status_payload(job))
+    return Response(body, media_type="application/json")
 
 
 @app.get("/api/playlist/file/{job_id}/{file_id}")
 async def playlist_file_download(job_id: str, file_id: str):
-    with PLAYLIST_JOBS_LOCK:
-        job = PLAYLIST_JOBS.get(job_id)
+    job = _job_snapshot(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Playlist job not found")
 
@@ -1384,13 +1564,12 @@ async def playlist_file_download(job_id: str, file_id: str):
         media_type = "audio/mp4"
     elif ext in {".opus", ".webm"}:
         media_type = "audio/ogg"
-    return FileResponse(file_path, filename=file_entry["filename"], media_type=media_type)
+    return LargeFileResponse(file_path, filename=file_entry["filename"], media_type=media_type)
 
 
 @app.get("/api/playlist/download/{job_id}")
 async def playlist_download(job_id: str):
-    with PLAYLIST_JOBS_LOCK:
-        job = PLAYLIST_JOBS.get(job_id)
+    job = _job_snapshot(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Playlist job not found")
     if job.get("status") != "done" or not job.get("zip_path"):
@@ -1401,9 +1580,9 @@ async def playlist_download(job_id: str):
         raise HTTPException(status_code=410, detail="Playlist file is no longer available")
 
     playlist_title = job.get("playlist_title") or "playlist"
-    safe_title = re.sub(r"[^a-zA-Z0-9 _\-\.]+", "", str(playlist_title)).strip() or "playlist"
+    safe_title = _RE_SAFE.sub("", str(playlist_title)).strip() or "playlist"
     filename = f"{safe_title}.zip"
-    return FileResponse(zip_path, filename=filename, media_type="application/zip")
+    return LargeFileResponse(zip_path, filename=filename, media_type="application/zip")
 
 
 @app.get("/api/health")